@@ -21,10 +21,13 @@
 # SOFTWARE.
 
 
+from django.db.models.signals import post_delete
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
+from aws_account.models import AwsAccount
 from aws_account.models import AwsUser
+from dashboard.vendor.connections import connection_registry
 
 __author__ = 'Arnaud Desclouds <arnaud.software@use.startmail.com>'
 
@@ -34,4 +37,10 @@ def handler(sender, **kwargs):
     if kwargs['created']:
         AwsUser.objects.create(
             user=kwargs['instance']
-        )
\ No newline at end of file
+        )
+
+
+@receiver(post_save, sender=AwsAccount)
+@receiver(post_delete, sender=AwsAccount)
+def invalidate_connections(sender, **kwargs):
+    connection_registry.invalidate(kwargs['instance'].pk)
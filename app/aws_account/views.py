@@ -41,7 +41,10 @@ from aws_account.forms import AwsAccountForm
 from aws_account.models import AwsAccount
 from aws_account.models import AwsUser
 from aws_account.tables import AwsAccountTable
+from dashboard.models.regions.region import Region
 from dashboard.vendor.aws_resources_controller import AwsResourcesController
+from dashboard.vendor.aws_resources_refresh import STAGE_DEPENDENCIES
+from dashboard.vendor.resource_freshness import reset_freshness
 
 __author__ = 'Arnaud Desclouds <arnaud.software@use.startmail.com>'
 
@@ -86,6 +89,7 @@ def create_aws_account_view(request):
             aws_user.resources_last_updated = datetime(1970, month=1, day=1,
                                                    tzinfo=timezone.utc)
             aws_user.save()
+            reset_freshness(aws_user)
             return HttpResponseRedirect('/aws-accounts/')
     else:
         form = AwsAccountForm()
@@ -129,3 +133,10 @@ class AwsAccountTableView(SingleTableView):
 
     def get_table_data(self):
         return AwsUser.objects.get(user=self.request.user).aws_accounts.all()
+
+    def get_context_data(self, **kwargs):
+        # Choices of the refresh form
+        context = super(AwsAccountTableView, self).get_context_data(**kwargs)
+        context['resource_types'] = list(STAGE_DEPENDENCIES)
+        context['regions'] = Region.objects.order_by('region_name')
+        return context
@@ -155,6 +155,63 @@ else:
         }
     }
 
+# Refresh of the AWS resources (non Django settings)
+# Number of threads describing the regions of a refresh job concurrently
+AWS_CRAWL_THREADS = 9
+# Number of resources per page of the paginated describe calls
+AWS_DESCRIBE_PAGE_SIZE = 500
+# One refresh unit per (type, account, region) if True, else one unit per
+# (type, account) crawling all the regions of the account concurrently
+REFRESH_UNITS_PER_REGION = True
+# Number of times a refresh unit is run before it is recorded as failed, each
+# attempt continuing from the checkpoints of the previous ones
+REFRESH_UNIT_ATTEMPTS = 3
+# A region where an account had no resources for empty_refreshes refreshes in
+# a row is only crawled every probe_interval seconds, except by a full sweep
+REGION_SKIPPING = {
+    'empty_refreshes': 3,
+    'probe_interval': 6 * 60 * 60,
+}
+# Minutes between two refreshes of each resource type, the types left out are
+# refreshed every AwsUser.resources_update_interval minutes
+RESOURCE_REFRESH_CADENCES = {
+    'keypairs': 6 * 60,
+    'security_groups': 60,
+    'amis': 6 * 60,
+    'instances': 5,
+    'snapshots': 6 * 60,
+    'volumes': 15,
+    'elastic_ips': 15,
+    'load_balancers': 15,
+}
+# 'boto' to connect to AWS, 'fake' to serve synthetic resources from
+# dashboard.vendor.fake_aws, configured by the FAKE_AWS dictionary (see
+# fake_aws.DEFAULT_CONFIG)
+AWS_BACKEND = 'boto'
+# Requests per second to AWS of each (account, region, service), adapted to
+# the throttling of AWS, and retries of the failed requests (see
+# dashboard.vendor.connections.DEFAULT_RATE_LIMIT)
+AWS_RATE_LIMIT = {
+    'rate': 10.0,
+    'max_rate': 100.0,
+    'retries': 5,
+}
+# Seconds an AWS request waits on its socket, and seconds after which a
+# failing request isn't retried anymore
+AWS_TIMEOUT = {
+    'socket': 10,
+    'call': 60,
+}
+# The calls to an (account, region) failing this many times within cooldown
+# seconds are stopped for cooldown seconds, the refresh units of the region
+# are recorded as stale meanwhile. Each worker checks every check_interval
+# seconds whether another one stopped them.
+AWS_CIRCUIT_BREAKER = {
+    'failures': 3,
+    'cooldown': 5 * 60,
+    'check_interval': 5,
+}
+
 ROOT_URLCONF = 'cloud_dashboard.urls'
 
 TEMPLATES = [
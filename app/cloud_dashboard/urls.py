@@ -36,6 +36,8 @@ from dashboard.views import Ec2TagTableView
 from dashboard.views import Ec2VolumeTableView
 from dashboard.views import change_state_ec2_instances_view
 from dashboard.views import change_state_ec2_volumes_view
+from dashboard.views import refresh_instance_states_view
+from dashboard.views import refresh_resources_view
 from aws_account.views import create_aws_account_view
 from aws_account.views import delete_aws_account_view
 from aws_account.views import create_user
@@ -83,4 +85,7 @@ urlpatterns = [
         name='aws_account_delete'),
     url(r'^stop-ec2-instances/$', change_state_ec2_instances_view),
     url(r'^manage-ec2-volumes/$', change_state_ec2_volumes_view),
+    url(r'^refresh/$', refresh_resources_view, name='refresh_resources'),
+    url(r'^refresh/instance-states/$', refresh_instance_states_view,
+        name='refresh_instance_states'),
 ]
@@ -0,0 +1,220 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 Haute École d'Ingénierie et de Gestion du Canton de Vaud
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+import json
+import resource
+import sys
+import time
+import uuid
+from contextlib import redirect_stdout
+
+import django_rq
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test.utils import override_settings
+from django_rq.settings import QUEUES
+from rq.worker import SimpleWorker
+
+from aws_account.models import AwsAccount
+from aws_account.models import AwsUser
+from dashboard.models.regions.availability_zone import AvailabilityZone
+from dashboard.models.regions.region import Region
+from dashboard.vendor import bulk_persistence
+from dashboard.vendor import fake_aws
+from dashboard.vendor.aws_resources_refresh import RECEPTION_JOBS
+from dashboard.vendor.aws_resources_refresh import start_refresh
+from dashboard.vendor.connections import connection_registry
+
+__author__ = 'Arnaud Desclouds <arnaud.software@use.startmail.com>'
+
+BENCHMARK_USERNAME = 'benchmark'
+
+
+class Command(BaseCommand):
+    help = ('Runs the reception jobs, then a whole refresh, against the fake '
+            'AWS backend and reports the cost of each stage as JSON. The '
+            'benchmark runs on the test database, created again, and on its '
+            'own Redis database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--accounts', type=int, default=1,
+                            help='Number of AWS accounts.')
+        parser.add_argument('--resources', type=int, default=1000,
+                            help='Number of resources of each account.')
+        parser.add_argument('--regions', default='us-east-1,eu-west-1',
+                            help='Regions holding the resources, separated '
+                                 'by commas.')
+        parser.add_argument('--latency', type=float, default=0.0,
+                            help='Seconds taken by each AWS request.')
+        parser.add_argument('--throttle-rate', type=float, default=0.0,
+                            help='Probability of an AWS request to be '
+                                 'throttled.')
+        parser.add_argument('--churn', type=float, default=0.1,
+                            help='Fraction of the instances changing state '
+                                 'before the second pass.')
+        parser.add_argument('--threads', type=int,
+                            default=settings.AWS_CRAWL_THREADS,
+                            help='Number of threads crawling the regions.')
+        parser.add_argument('--redis-db', type=int, default=15,
+                            help='Redis database of the queue and the '
+                                 'caches of the benchmark, its queue must '
+                                 'be empty.')
+        parser.add_argument('--output',
+                            help='File to write the report to, stdout by '
+                                 'default.')
+
+    def handle(self, *args, **options):
+        # The benchmark runs on a throwaway database and its own Redis
+        # database, so that the refresh units it drains and its sweeps never
+        # see real resources.
+        queue_config = QUEUES['high']
+        redis_db = queue_config.get('DB', 0)
+        if options['redis_db'] == redis_db:
+            raise CommandError('The benchmark can\'t use the Redis database '
+                               'of the queue: {}'.format(redis_db))
+        queue_config['DB'] = options['redis_db']
+        try:
+            queued = len(django_rq.get_queue('high'))
+            if queued:
+                raise CommandError(
+                    '{} jobs already queued in the Redis database {}'.format(
+                        queued, options['redis_db']))
+            database_name = connection.settings_dict['NAME']
+            connection.creation.create_test_db(verbosity=0, autoclobber=True,
+                                               serialize=False)
+            try:
+                report = _benchmark(options)
+            finally:
+                connection.creation.destroy_test_db(database_name,
+                                                    verbosity=0)
+        finally:
+            queue_config['DB'] = redis_db
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as report_file:
+                report_file.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+
+def _benchmark(options):
+    """Runs the stages of the benchmark and returns the report."""
+    region_names = options['regions'].split(',')
+    fake_config = {'resources_per_account': options['resources'],
+                   'regions': tuple(region_names),
+                   'latency': options['latency'],
+                   'throttle_rate': options['throttle_rate']}
+    report = {'options': {name: options[name] for name in (
+                  'accounts', 'resources', 'regions', 'latency',
+                  'throttle_rate', 'churn', 'threads')},
+              'stages': []}
+    # The jobs print their progress, stdout is kept for the report
+    with override_settings(AWS_BACKEND='fake', FAKE_AWS=fake_config,
+                           AWS_CRAWL_THREADS=options['threads']), \
+            redirect_stdout(sys.stderr):
+        fake_aws.reset()
+        aws_user, aws_accounts = _seed(options['accounts'], region_names)
+        aws_account_ids = [aws_account.pk for aws_account in aws_accounts]
+
+        # First pass on an empty database, second pass after some changes
+        # of the instances.
+        for pass_name in ('initial', 'steady'):
+            if pass_name == 'steady':
+                fake_aws.advance(options['churn'])
+            for resource_type, receive in RECEPTION_JOBS.items():
+                report['stages'].append(_measure(
+                    resource_type, pass_name, receive, region_names,
+                    aws_account_ids))
+
+        # The prices are scraped from the website of AWS, they aren't part
+        # of the refresh measured.
+        report['stages'].append(_measure(
+            'refresh', 'steady', _refresh, aws_user, aws_accounts,
+            region_names))
+    return report
+
+
+def _seed(nb_accounts, region_names):
+    # Creates the benchmark user, its accounts and the regions in the
+    # throwaway database
+    user = User.objects.create_user(username=BENCHMARK_USERNAME,
+                                    password=uuid.uuid4().hex)
+    aws_user = AwsUser.objects.get(user=user)
+    aws_accounts = []
+    for i in range(nb_accounts):
+        aws_account = AwsAccount.objects.create(
+            name='benchmark-{}'.format(i),
+            aws_access_key_id='BENCHMARK{:04d}'.format(i),
+            aws_secret_access_key=uuid.uuid4().hex)
+        aws_user.aws_accounts.add(aws_account)
+        aws_accounts.append(aws_account)
+
+    for region_name in region_names:
+        region, _ = Region.objects.get_or_create(region_name=region_name)
+        for zone in connection_registry.get(aws_accounts[0],
+                                            region_name).get_all_zones():
+            AvailabilityZone.objects.get_or_create(name=zone.name,
+                                                   region=region)
+    return aws_user, aws_accounts
+
+
+def _refresh(aws_user, aws_accounts, region_names):
+    # Runs the units of a refresh in this process until there are no more
+    start_refresh(uuid.uuid4().hex, aws_user, aws_accounts,
+                  list(Region.objects.filter(region_name__in=region_names)),
+                  resource_types=list(RECEPTION_JOBS))
+    queue = django_rq.get_queue('high')
+    SimpleWorker([queue], connection=queue.connection).work(burst=True)
+
+
+def _measure(name, pass_name, function, *args):
+    """Runs a stage and returns what it cost.
+
+    The queries counted are the ones of the connection of this thread, the
+    threads crawling the regions only call AWS. The peak RSS is the one of
+    the process so far.
+    """
+    requests = fake_aws.get_request_counts()
+    rows = sum(bulk_persistence.rows_written.values())
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        function(*args)
+        wall_time = time.perf_counter() - start
+    requests = fake_aws.get_request_counts() - requests
+    rows = sum(bulk_persistence.rows_written.values()) - rows
+    return {'stage': name,
+            'pass': pass_name,
+            'wall_time': wall_time,
+            'api_calls': sum(requests.values()),
+            'api_calls_by_action': dict(requests),
+            'db_queries': len(queries.captured_queries),
+            'rows_written': rows,
+            'rows_per_second': rows / wall_time if wall_time else 0.0,
+            'peak_rss_kb': resource.getrusage(
+                resource.RUSAGE_SELF).ru_maxrss}
@@ -0,0 +1,101 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 Haute École d'Ingénierie et de Gestion du Canton de Vaud
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+import timeit
+
+from boto.ec2.instance import Instance
+from boto.ec2.snapshot import Snapshot
+from boto.ec2.volume import Volume
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management.base import BaseCommand
+from django.db.models.fields.related import ForeignKey
+from django.db.models.fields.related import ManyToManyField
+from django.db.models.fields.related import OneToOneField
+
+from dashboard.models.ec2.ec2_instance import Ec2Instance
+from dashboard.models.ec2.ec2_snapshot import Ec2Snapshot
+from dashboard.models.ec2.ec2_volume import Ec2Volume
+from dashboard.vendor.introspection import introspect
+
+__author__ = 'Arnaud Desclouds <arnaud.software@use.startmail.com>'
+
+_RELATIONS = {OneToOneField, ForeignKey, ManyToManyField}
+
+
+class Command(BaseCommand):
+    help = ('Compares the extraction of the attributes of boto objects by '
+            'introspect with the former dir() based introspection.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--objects', type=int, default=1000,
+                            help='Number of boto objects of each type.')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Number of runs, the best one is kept.')
+
+    def handle(self, *args, **options):
+        samples = []
+        for i in range(options['objects']):
+            instance = Instance()
+            instance.id = 'i-{:08x}'.format(i)
+            instance.instance_type = 't2.micro'
+            samples.append((instance, Ec2Instance))
+            volume = Volume()
+            volume.id = 'vol-{:08x}'.format(i)
+            volume.size = 8
+            samples.append((volume, Ec2Volume))
+            snapshot = Snapshot()
+            snapshot.id = 'snap-{:08x}'.format(i)
+            snapshot.volume_size = 8
+            samples.append((snapshot, Ec2Snapshot))
+
+        for boto_obj, django_model in samples[:3]:
+            if introspect(boto_obj, django_model) != _dir_introspect(
+                    boto_obj, django_model):
+                self.stderr.write('Different attributes extracted for ' +
+                                  django_model.__name__)
+
+        timings = {}
+        for name, function in (('dir', _dir_introspect),
+                               ('extractor', introspect)):
+            timings[name] = min(timeit.repeat(
+                lambda: [function(boto_obj, django_model)
+                         for boto_obj, django_model in samples],
+                number=1, repeat=options['repeat']))
+            self.stdout.write('{}: {:.1f} us per object'.format(
+                name, timings[name] * 1e6 / len(samples)))
+        self.stdout.write('speedup: {:.1f}x'.format(
+            timings['dir'] / timings['extractor']))
+
+
+def _dir_introspect(boto_obj, django_model):
+    """The introspection of a boto object as done before the extractors."""
+    attrs = {}
+    for attr in dir(boto_obj):
+        try:
+            django_model._meta.get_field(attr)
+            if type(django_model._meta.get_field(attr)) not in _RELATIONS:
+                attrs[attr] = getattr(boto_obj, attr)
+        except FieldDoesNotExist:
+            continue
+    return attrs
@@ -0,0 +1,55 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 Haute École d'Ingénierie et de Gestion du Canton de Vaud
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from django.core.management.base import BaseCommand
+
+from aws_account.models import AwsUser
+from dashboard.vendor.aws_resources_controller import AwsResourcesController
+from dashboard.vendor.exceptions import NoAwsAccountException
+
+__author__ = 'Arnaud Desclouds <arnaud.software@use.startmail.com>'
+
+
+class Command(BaseCommand):
+    help = ('Refreshes the states of the instances of every user, without '
+            'a full refresh. Meant to be run every minute.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', dest='usernames',
+                            help='Name of a user to refresh, all the users '
+                                 'by default. May be repeated.')
+
+    def handle(self, *args, **options):
+        aws_users = AwsUser.objects.filter(
+            aws_accounts__isnull=False).distinct().select_related('user')
+        if options['usernames']:
+            aws_users = aws_users.filter(
+                user__username__in=options['usernames'])
+        for aws_user in aws_users:
+            try:
+                job = AwsResourcesController(
+                    aws_user.user).refresh_instance_states()
+            except NoAwsAccountException as e:
+                self.stderr.write('{}: {}'.format(aws_user.user.username, e))
+                continue
+            self.stdout.write('{}: job {}'.format(aws_user.user.username,
+                                                  job.id))
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0002_auto_20151003_1303'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='ec2loadbalancer',
+            unique_together=set([('name', 'region')]),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aws_account', '0001_initial'),
+        ('dashboard', '0003_ec2loadbalancer_unique_name_region'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Refresh',
+            fields=[
+                ('id', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('created_time', models.DateTimeField(auto_now_add=True)),
+                ('finished_time', models.DateTimeField(null=True)),
+                ('units_total', models.IntegerField(default=0)),
+                ('units_done', models.IntegerField(default=0)),
+                ('units_failed', models.IntegerField(default=0)),
+                ('aws_user', models.ForeignKey(to='aws_account.AwsUser')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RefreshUnit',
+            fields=[
+                ('id', models.AutoField(auto_created=True, verbose_name='ID', serialize=False, primary_key=True)),
+                ('resource_type', models.CharField(max_length=255, choices=[('keypairs', 'keypairs'), ('security_groups', 'security_groups'), ('amis', 'amis'), ('instances', 'instances'), ('snapshots', 'snapshots'), ('volumes', 'volumes'), ('elastic_ips', 'elastic_ips'), ('load_balancers', 'load_balancers')])),
+                ('status', models.CharField(max_length=255, default='queued', choices=[('queued', 'queued'), ('running', 'running'), ('done', 'done'), ('failed', 'failed')])),
+                ('started_time', models.DateTimeField(null=True)),
+                ('finished_time', models.DateTimeField(null=True)),
+                ('aws_account', models.ForeignKey(to='aws_account.AwsAccount')),
+                ('refresh', models.ForeignKey(related_name='units', to='dashboard.Refresh')),
+                ('region', models.ForeignKey(to='dashboard.Region')),
+            ],
+        ),
+    ]
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0004_refresh_refreshunit'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='refreshunit',
+            name='region',
+            field=models.ForeignKey(to='dashboard.Region', null=True),
+        ),
+    ]
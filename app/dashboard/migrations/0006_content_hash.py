@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0005_refreshunit_region_null'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ec2ami',
+            name='content_hash',
+            field=models.CharField(max_length=40, null=True),
+        ),
+        migrations.AddField(
+            model_name='ec2elasticip',
+            name='content_hash',
+            field=models.CharField(max_length=40, null=True),
+        ),
+        migrations.AddField(
+            model_name='ec2instance',
+            name='content_hash',
+            field=models.CharField(max_length=40, null=True),
+        ),
+        migrations.AddField(
+            model_name='ec2keypair',
+            name='content_hash',
+            field=models.CharField(max_length=40, null=True),
+        ),
+        migrations.AddField(
+            model_name='ec2loadbalancer',
+            name='content_hash',
+            field=models.CharField(max_length=40, null=True),
+        ),
+        migrations.AddField(
+            model_name='ec2securitygroup',
+            name='content_hash',
+            field=models.CharField(max_length=40, null=True),
+        ),
+        migrations.AddField(
+            model_name='ec2snapshot',
+            name='content_hash',
+            field=models.CharField(max_length=40, null=True),
+        ),
+        migrations.AddField(
+            model_name='ec2volume',
+            name='content_hash',
+            field=models.CharField(max_length=40, null=True),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+TAGGED_MODELS = ['Ec2Ami', 'Ec2Instance', 'Ec2LoadBalancer',
+                 'Ec2SecurityGroup', 'Ec2Snapshot', 'Ec2Volume']
+
+
+def merge_duplicate_tags(apps, schema_editor):
+    """Merges the Ec2Tag rows having the same account, region, key and value.
+
+    The relations of the duplicates are moved to the tag kept. The content
+    hash of the tagged resources is reset so that the next refresh
+    synchronizes all their tags.
+    """
+    Ec2Tag = apps.get_model('dashboard', 'Ec2Tag')
+    kept = {}
+    duplicates = {}
+    for tag in Ec2Tag.objects.order_by('id'):
+        key = (tag.aws_account_id, tag.region_id, tag.key, tag.value)
+        if key in kept:
+            duplicates[tag.id] = kept[key]
+        else:
+            kept[key] = tag.id
+
+    for model_name in TAGGED_MODELS:
+        model = apps.get_model('dashboard', model_name)
+        through = model._meta.get_field('tags').rel.through
+        source = model._meta.model_name + '_id'
+        if duplicates:
+            relations = through.objects.filter(
+                ec2tag_id__in=list(duplicates))
+            moved = {(getattr(r, source), duplicates[r.ec2tag_id])
+                     for r in relations}
+            relations.delete()
+            for resource_id, tag_id in moved:
+                through.objects.get_or_create(
+                    **{source: resource_id, 'ec2tag_id': tag_id})
+        model.objects.update(content_hash=None)
+
+    Ec2Tag.objects.filter(id__in=list(duplicates)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0006_content_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_tags,
+                             migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='ec2tag',
+            unique_together=set([('aws_account', 'region', 'key', 'value')]),
+        ),
+    ]
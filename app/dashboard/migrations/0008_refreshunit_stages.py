@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0007_ec2tag_unique'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='refreshunit',
+            name='aws_account',
+            field=models.ForeignKey(to='aws_account.AwsAccount', null=True),
+        ),
+        migrations.AlterField(
+            model_name='refreshunit',
+            name='resource_type',
+            field=models.CharField(max_length=255, choices=[('keypairs', 'keypairs'), ('security_groups', 'security_groups'), ('amis', 'amis'), ('instances', 'instances'), ('snapshots', 'snapshots'), ('volumes', 'volumes'), ('elastic_ips', 'elastic_ips'), ('load_balancers', 'load_balancers'), ('prices', 'prices'), ('instance_prices', 'instance_prices')]),
+        ),
+        migrations.AlterField(
+            model_name='refreshunit',
+            name='status',
+            field=models.CharField(max_length=255, default='waiting', choices=[('waiting', 'waiting'), ('queued', 'queued'), ('running', 'running'), ('done', 'done'), ('failed', 'failed')]),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0008_refreshunit_stages'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='refresh',
+            name='resource_ids',
+            field=models.TextField(null=True),
+        ),
+    ]
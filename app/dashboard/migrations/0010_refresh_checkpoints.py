@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aws_account', '0001_initial'),
+        ('dashboard', '0009_refresh_resource_ids'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='refreshunit',
+            name='attempts',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='RefreshCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, verbose_name='ID', serialize=False, primary_key=True)),
+                ('resource_type', models.CharField(max_length=255)),
+                ('pages_done', models.IntegerField(default=0)),
+                ('page_token', models.TextField(null=True)),
+                ('finished', models.BooleanField(default=False)),
+                ('aws_account', models.ForeignKey(to='aws_account.AwsAccount')),
+                ('refresh', models.ForeignKey(related_name='checkpoints', to='dashboard.Refresh')),
+                ('region', models.ForeignKey(to='dashboard.Region')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='refreshcheckpoint',
+            unique_together=set([('refresh', 'resource_type', 'aws_account', 'region')]),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0010_refresh_checkpoints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='refresh',
+            name='units_stale',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='refreshunit',
+            name='status',
+            field=models.CharField(max_length=255, default='waiting', choices=[('waiting', 'waiting'), ('queued', 'queued'), ('running', 'running'), ('done', 'done'), ('failed', 'failed'), ('stale', 'stale')]),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aws_account', '0001_initial'),
+        ('dashboard', '0011_refresh_stale'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegionActivity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, verbose_name='ID', serialize=False, primary_key=True)),
+                ('last_seen', models.DateTimeField(null=True)),
+                ('last_probed', models.DateTimeField(null=True)),
+                ('resource_count', models.IntegerField(default=0)),
+                ('empty_refreshes', models.IntegerField(default=0)),
+                ('aws_account', models.ForeignKey(to='aws_account.AwsAccount')),
+                ('region', models.ForeignKey(to='dashboard.Region')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='regionactivity',
+            unique_together=set([('aws_account', 'region')]),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aws_account', '0001_initial'),
+        ('dashboard', '0012_regionactivity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResourceFreshness',
+            fields=[
+                ('id', models.AutoField(auto_created=True, verbose_name='ID', serialize=False, primary_key=True)),
+                ('resource_type', models.CharField(max_length=255)),
+                ('last_refreshed', models.DateTimeField()),
+                ('aws_user', models.ForeignKey(to='aws_account.AwsUser')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='resourcefreshness',
+            unique_together=set([('aws_user', 'resource_type')]),
+        ),
+    ]
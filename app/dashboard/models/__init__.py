@@ -42,5 +42,11 @@ from dashboard.models.ec2 import ec2_volume
 
 from dashboard.models.regions import region
 from dashboard.models.regions import availability_zone
+from dashboard.models.regions import region_activity
 
 from dashboard.models.prices import ec2_price
+
+from dashboard.models.refreshes import refresh
+from dashboard.models.refreshes import refresh_unit
+from dashboard.models.refreshes import refresh_checkpoint
+from dashboard.models.refreshes import resource_freshness
@@ -44,6 +44,8 @@ class Ec2Ami(models.Model):
     root_device_type = models.CharField(max_length=255)
     state = models.CharField(max_length=255)
     tags = models.ManyToManyField(Ec2Tag, blank=True)
+    # Hash of the content last received from AWS, see bulk_sync
+    content_hash = models.CharField(max_length=40, null=True)
 
     def has_tags(self):
         return self.tags.all().exists()
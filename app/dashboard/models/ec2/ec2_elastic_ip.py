@@ -46,3 +46,5 @@ class Ec2ElasticIp(models.Model):
     network_interface_owner_id = models.CharField(max_length=255, null=True)
     private_ip_address = models.GenericIPAddressField(null=True)
     region = models.ForeignKey(Region)
+    # Hash of the content last received from AWS, see bulk_sync
+    content_hash = models.CharField(max_length=40, null=True)
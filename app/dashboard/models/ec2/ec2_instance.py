@@ -105,7 +105,8 @@ class Ec2Instance(models.Model):
     state = models.CharField(max_length=255,
                              choices=STATES)
     tags = models.ManyToManyField(Ec2Tag, blank=True)
-
+    # Hash of the content last received from AWS, see bulk_sync
+    content_hash = models.CharField(max_length=40, null=True)
 
     def has_tags(self):
         return self.tags.all().exists()
@@ -34,3 +34,5 @@ class Ec2Keypair(models.Model):
     fingerprint = models.CharField(max_length=255)
     aws_account = models.ForeignKey(AwsAccount)
     region = models.ForeignKey(Region)
+    # Hash of the content last received from AWS, see bulk_sync
+    content_hash = models.CharField(max_length=40, null=True)
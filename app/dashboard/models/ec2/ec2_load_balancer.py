@@ -43,3 +43,8 @@ class Ec2LoadBalancer(models.Model):
     region = models.ForeignKey(Region, null=True)
     security_groups = models.ManyToManyField(Ec2SecurityGroup)
     tags = models.ManyToManyField(Ec2Tag)
+    # Hash of the content last received from AWS, see bulk_sync
+    content_hash = models.CharField(max_length=40, null=True)
+
+    class Meta:
+        unique_together = ('name', 'region')
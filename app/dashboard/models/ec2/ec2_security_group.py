@@ -38,3 +38,5 @@ class Ec2SecurityGroup(models.Model):
     owner_id = models.CharField(max_length=255)
     region = models.ForeignKey(Region)
     tags = models.ManyToManyField(Ec2Tag, blank=True)
+    # Hash of the content last received from AWS, see bulk_sync
+    content_hash = models.CharField(max_length=40, null=True)
@@ -44,3 +44,5 @@ class Ec2Snapshot(models.Model):
     tags = models.ManyToManyField(Ec2Tag, blank=True)
     # To solve circular dependency problem
     created_from_volume = models.ForeignKey('dashboard.Ec2Volume', null=True)
+    # Hash of the content last received from AWS, see bulk_sync
+    content_hash = models.CharField(max_length=40, null=True)
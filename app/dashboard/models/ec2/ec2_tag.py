@@ -33,3 +33,6 @@ class Ec2Tag(models.Model):
     region = models.ForeignKey(Region)
     key = models.CharField(max_length=255)
     value = models.CharField(max_length=255)
+
+    class Meta:
+        unique_together = ('aws_account', 'region', 'key', 'value')
@@ -47,3 +47,5 @@ class Ec2Volume(models.Model):
                                               null=True)
     type = models.CharField(max_length=255)
     tags = models.ManyToManyField(Ec2Tag, blank=True)
+    # Hash of the content last received from AWS, see bulk_sync
+    content_hash = models.CharField(max_length=40, null=True)
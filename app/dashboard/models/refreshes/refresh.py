@@ -0,0 +1,70 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 Haute École d'Ingénierie et de Gestion du Canton de Vaud
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+import json
+
+from django.db import models
+
+from aws_account.models import AwsUser
+
+__author__ = 'Arnaud Desclouds <arnaud.software@use.startmail.com>'
+
+
+class Refresh(models.Model):
+    """
+        A refresh of the resources of an AWS user, split in RefreshUnits.
+
+        The refresh is finished once every one of its units is done, has
+        failed or is stale, having skipped a region whose circuit breaker
+        was open. A partial refresh only describes the resources given by
+        id, it never deletes the resources it doesn't see.
+    """
+    id = models.CharField(primary_key=True, max_length=32)
+    aws_user = models.ForeignKey(AwsUser)
+    created_time = models.DateTimeField(auto_now_add=True)
+    finished_time = models.DateTimeField(null=True)
+    units_total = models.IntegerField(default=0)
+    units_done = models.IntegerField(default=0)
+    units_failed = models.IntegerField(default=0)
+    units_stale = models.IntegerField(default=0)
+    # JSON of the ids of the resources to refresh by resource type, for a
+    # refresh targeting some resources only
+    resource_ids = models.TextField(null=True)
+
+    def is_finished(self):
+        return self.finished_time is not None
+
+    def is_partial(self):
+        return self.resource_ids is not None
+
+    def get_resource_ids(self):
+        if self.resource_ids is None:
+            return None
+        return json.loads(self.resource_ids)
+
+    def is_stale(self):
+        return self.units_stale > 0
+
+    def succeeded(self):
+        return self.is_finished() and not self.units_failed
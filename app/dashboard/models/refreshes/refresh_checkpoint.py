@@ -0,0 +1,54 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 Haute École d'Ingénierie et de Gestion du Canton de Vaud
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+from django.db import models
+
+from aws_account.models import AwsAccount
+from dashboard.models.refreshes.refresh import Refresh
+from dashboard.models.regions.region import Region
+
+__author__ = 'Arnaud Desclouds <arnaud.software@use.startmail.com>'
+
+
+class RefreshCheckpoint(models.Model):
+    """
+        The progress of the crawl of a paginated resource type of an AWS
+        account in a region during a refresh.
+
+        The checkpoint is saved once a page is persisted, a job retried after
+        being interrupted continues from the page following it instead of
+        starting over, and skips the (account, region) already finished.
+    """
+    refresh = models.ForeignKey(Refresh, related_name='checkpoints')
+    resource_type = models.CharField(max_length=255)
+    aws_account = models.ForeignKey(AwsAccount)
+    region = models.ForeignKey(Region)
+    pages_done = models.IntegerField(default=0)
+    # The next token of the last page persisted, null after the last page
+    page_token = models.TextField(null=True)
+    finished = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = ('refresh', 'resource_type', 'aws_account',
+                           'region')
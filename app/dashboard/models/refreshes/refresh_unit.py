@@ -0,0 +1,75 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 Haute École d'Ingénierie et de Gestion du Canton de Vaud
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+from django.db import models
+
+from aws_account.models import AwsAccount
+from dashboard.models.refreshes.refresh import Refresh
+from dashboard.models.regions.region import Region
+
+__author__ = 'Arnaud Desclouds <arnaud.software@use.startmail.com>'
+
+
+class RefreshUnit(models.Model):
+    """
+        The refresh of one resource type of an AWS account in a region, or in
+        all the regions when region is null, or a global stage of a refresh
+        (prices, instance_prices) when the account is null too.
+
+        Each unit is an independent RQ job, waiting for the units of the
+        stages it depends on, the units of a refresh can run in parallel on
+        several workers. An interrupted unit is run again, up to
+        REFRESH_UNIT_ATTEMPTS times, continuing from its RefreshCheckpoints.
+    """
+    refresh = models.ForeignKey(Refresh, related_name='units')
+    RESOURCE_TYPES = (
+        ('keypairs', 'keypairs'),
+        ('security_groups', 'security_groups'),
+        ('amis', 'amis'),
+        ('instances', 'instances'),
+        ('snapshots', 'snapshots'),
+        ('volumes', 'volumes'),
+        ('elastic_ips', 'elastic_ips'),
+        ('load_balancers', 'load_balancers'),
+        ('prices', 'prices'),
+        ('instance_prices', 'instance_prices')
+    )
+    resource_type = models.CharField(max_length=255,
+                                     choices=RESOURCE_TYPES)
+    aws_account = models.ForeignKey(AwsAccount, null=True)
+    region = models.ForeignKey(Region, null=True)
+    STATUSES = (
+        ('waiting', 'waiting'),
+        ('queued', 'queued'),
+        ('running', 'running'),
+        ('done', 'done'),
+        ('failed', 'failed'),
+        ('stale', 'stale')
+    )
+    status = models.CharField(max_length=255,
+                              choices=STATUSES,
+                              default='waiting')
+    started_time = models.DateTimeField(null=True)
+    finished_time = models.DateTimeField(null=True)
+    attempts = models.IntegerField(default=0)
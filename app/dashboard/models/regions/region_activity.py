@@ -0,0 +1,52 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 Haute École d'Ingénierie et de Gestion du Canton de Vaud
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+from django.db import models
+
+from aws_account.models import AwsAccount
+from dashboard.models.regions.region import Region
+
+__author__ = 'Arnaud Desclouds <arnaud.software@use.startmail.com>'
+
+
+class RegionActivity(models.Model):
+    """
+        The resources found in a region of an AWS account by the refreshes.
+
+        Recorded by every refresh crawling the region without failure, a
+        region found empty by REGION_SKIPPING['empty_refreshes'] refreshes in
+        a row is only probed again every REGION_SKIPPING['probe_interval']
+        seconds.
+    """
+    aws_account = models.ForeignKey(AwsAccount)
+    region = models.ForeignKey(Region)
+    # The last time resources were found, null if they never were
+    last_seen = models.DateTimeField(null=True)
+    last_probed = models.DateTimeField(null=True)
+    resource_count = models.IntegerField(default=0)
+    # The number of refreshes in a row finding no resources
+    empty_refreshes = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('aws_account', 'region')
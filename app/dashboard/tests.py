@@ -22,11 +22,64 @@
 
 
 import datetime
+import time
+import uuid
+from unittest import mock
 
+import django_rq
+from boto.ec2.volume import Volume
+from boto.exception import EC2ResponseError
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.test import override_settings
 from django.utils import timezone
+from django_rq.settings import QUEUES
 
+from aws_account.models import AwsAccount
+from aws_account.models import AwsUser
 from dashboard.models.ec2.ec2_instance import Ec2Instance
+from dashboard.models.ec2.ec2_keypair import Ec2Keypair
+from dashboard.models.ec2.ec2_load_balancer import Ec2LoadBalancer
+from dashboard.models.ec2.ec2_security_group import Ec2SecurityGroup
+from dashboard.models.ec2.ec2_snapshot import Ec2Snapshot
+from dashboard.models.ec2.ec2_volume import Ec2Volume
+from dashboard.models.refreshes.refresh import Refresh
+from dashboard.models.refreshes.refresh_checkpoint import RefreshCheckpoint
+from dashboard.models.refreshes.refresh_unit import RefreshUnit
+from dashboard.models.refreshes.resource_freshness import ResourceFreshness
+from dashboard.models.regions.availability_zone import AvailabilityZone
+from dashboard.models.regions.region import Region
+from dashboard.models.regions.region_activity import RegionActivity
+from dashboard.vendor import aws_resources_reception
+from dashboard.vendor import fake_aws
+from dashboard.vendor import resource_freshness
+from dashboard.vendor.aws_resources_controller import AwsResourcesController
+from dashboard.vendor.aws_resources_reception import receive_instance_states_async
+from dashboard.vendor.aws_resources_refresh import RECEPTION_JOBS
+from dashboard.vendor.aws_resources_refresh import STAGE_DEPENDENCIES
+from dashboard.vendor.aws_resources_refresh import _enqueue_dependent_units
+from dashboard.vendor.aws_resources_refresh import start_refresh
+from dashboard.vendor.bulk_persistence import bulk_add_relations
+from dashboard.vendor.bulk_persistence import bulk_delete
+from dashboard.vendor.bulk_persistence import bulk_remove_relations
+from dashboard.vendor.bulk_persistence import bulk_sync
+from dashboard.vendor.bulk_persistence import bulk_upsert
+from dashboard.vendor.bulk_persistence import content_hash
+from dashboard.vendor.checkpoints import Checkpoints
+from dashboard.vendor.circuit_breakers import CircuitBreaker
+from dashboard.vendor.connections import ConnectionRegistry
+from dashboard.vendor.connections import connection_registry
+from dashboard.vendor.crawling import crawl
+from dashboard.vendor.crawling import crawl_pages
+from dashboard.vendor.exceptions import RegionUnavailableException
+from dashboard.vendor.cross_references import CrossReferenceResolver
+from dashboard.vendor.introspection import introspect
+from dashboard.vendor.inventory import Inventory
+from dashboard.vendor.rate_limiting import AdaptiveTokenBucket
+from dashboard.vendor.rate_limiting import limit_rate
+from dashboard.vendor.region_activity import select_regions
+from dashboard.vendor.resource_freshness import claim_stale_resource_types
+from dashboard.vendor.resource_freshness import release_resource_types
 
 __author__ = 'Arnaud Desclouds <arnaud.software@use.startmail.com>'
 
@@ -47,3 +100,758 @@ class InstanceCreationTests(TestCase):
 
     def test_number_instances(self):
         self.assertEqual(len(Ec2Instance.objects.all()), self.nb_instances)
+
+
+class BulkPersistenceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.region = Region.objects.create(region_name='eu-west-1')
+
+    def test_bulk_upsert(self):
+        keypairs = [{'key_name': 'key-{}'.format(i),
+                     'fingerprint': 'fingerprint',
+                     'aws_account': 42,
+                     'region': self.region} for i in range(3)]
+        self.assertEqual(bulk_upsert(Ec2Keypair, keypairs), 3)
+
+        keypairs[0]['fingerprint'] = 'new-fingerprint'
+        self.assertEqual(bulk_upsert(Ec2Keypair, keypairs), 0)
+        self.assertEqual(Ec2Keypair.objects.count(), 3)
+        self.assertEqual(Ec2Keypair.objects.get(pk='key-0').fingerprint,
+                         'new-fingerprint')
+
+    def test_bulk_sync(self):
+        keypairs = [{'key_name': 'key-{}'.format(i),
+                     'fingerprint': 'fingerprint',
+                     'aws_account': 42,
+                     'region': self.region} for i in range(3)]
+        for keypair in keypairs:
+            keypair['content_hash'] = content_hash(keypair)
+        result = bulk_sync(Ec2Keypair, keypairs)
+        self.assertEqual((result.inserted, result.updated, result.unchanged),
+                         (3, 0, 0))
+
+        keypairs[0]['fingerprint'] = 'new-fingerprint'
+        keypairs[0]['content_hash'] = content_hash(keypairs[0])
+        result = bulk_sync(Ec2Keypair, keypairs)
+        self.assertEqual((result.inserted, result.updated, result.unchanged),
+                         (0, 1, 2))
+        self.assertEqual(result.changed, {'key-0'})
+        self.assertEqual(Ec2Keypair.objects.get(pk='key-0').fingerprint,
+                         'new-fingerprint')
+
+    def test_bulk_add_relations(self):
+        Ec2Instance.objects.create(id='i-1',
+                                   instance_type='t2.micro',
+                                   state='running',
+                                   launch_time=datetime.datetime.now(
+                                       timezone.utc),
+                                   aws_account_id=42)
+        for i in range(2):
+            Ec2SecurityGroup.objects.create(id='sg-{}'.format(i),
+                                            aws_account_id=42,
+                                            region=self.region)
+        pairs = [('i-1', 'sg-0'), ('i-1', 'sg-1'), ('i-1', 'sg-0')]
+        self.assertEqual(
+            bulk_add_relations(Ec2Instance, 'security_groups', pairs), 2)
+        self.assertEqual(
+            bulk_add_relations(Ec2Instance, 'security_groups', pairs), 0)
+        self.assertEqual(
+            Ec2Instance.objects.get(pk='i-1').security_groups.count(), 2)
+
+        bulk_remove_relations(Ec2Instance, 'security_groups',
+                              [('i-1', 'sg-0'), ('i-1', 'sg-2')])
+        self.assertEqual(list(Ec2Instance.objects.get(
+            pk='i-1').security_groups.values_list('pk', flat=True)),
+                         ['sg-1'])
+
+    def test_bulk_delete(self):
+        for i in range(2):
+            Ec2Instance.objects.create(id='i-{}'.format(i),
+                                       instance_type='t2.micro',
+                                       state='running',
+                                       launch_time=datetime.datetime.now(
+                                           timezone.utc),
+                                       aws_account_id=42)
+        Ec2Volume.objects.create(id='vol-1', aws_account_id=42,
+                                 instance_id_id='i-0', content_hash='hash')
+        self.assertEqual(bulk_delete(
+            Ec2Instance.objects.exclude(pk__in=['i-1'])), 1)
+        self.assertEqual(list(Ec2Instance.objects.values_list(
+            'pk', flat=True)), ['i-1'])
+        volume = Ec2Volume.objects.get(pk='vol-1')
+        self.assertIsNone(volume.instance_id)
+        self.assertIsNone(volume.content_hash)
+
+
+class CrossReferenceResolverTests(TestCase):
+    class Connection(object):
+        """Describes every AMI and snapshot except the ones in not_found."""
+
+        def __init__(self, not_found):
+            self.not_found = not_found
+            self.calls = 0
+
+        def get_all_images(self, image_ids):
+            return self._describe('AMI', 'InvalidAMIID.NotFound', image_ids)
+
+        def get_all_snapshots(self, snapshot_ids):
+            return self._describe('Snapshot', 'InvalidSnapshot.NotFound',
+                                  snapshot_ids)
+
+        def _describe(self, class_name, not_found_code, ids):
+            self.calls += 1
+            if self.not_found.intersection(ids):
+                e = EC2ResponseError(400, 'Bad Request')
+                e.error_code = not_found_code
+                raise e
+            return [type(class_name, (object,), {'id': resource_id})()
+                    for resource_id in ids]
+
+    def test_resolve_snapshots_in_chunks(self):
+        connection = self.Connection({'snap-13'})
+        resolver = CrossReferenceResolver(connection)
+        for i in range(450):
+            resolver.reference_snapshot('snap-{}'.format(i))
+        resolver.resolve()
+
+        self.assertEqual(len(resolver.snapshots), 449)
+        self.assertFalse(resolver.has_snapshot('snap-13'))
+        self.assertTrue(resolver.has_snapshot('snap-14'))
+        self.assertLess(connection.calls, 25)
+
+        # Fetched and unknown snapshots aren't described again
+        resolver.resolve()
+        self.assertLess(connection.calls, 25)
+
+    def test_resolve_images_once(self):
+        connection = self.Connection({'ami-3'})
+        resolver = CrossReferenceResolver(connection)
+        resolver.add_images([type('AMI', (object,), {'id': 'ami-0'})()])
+        for i in range(5):
+            resolver.reference_image('ami-{}'.format(i))
+            resolver.reference_image('ami-{}'.format(i))
+        resolver.resolve()
+
+        self.assertEqual(sorted(resolver.images),
+                         ['ami-0', 'ami-1', 'ami-2', 'ami-4'])
+        calls = connection.calls
+        # Fetched and unknown AMIs aren't described again
+        resolver.resolve()
+        self.assertEqual(connection.calls, calls)
+
+
+class CrawlTests(TestCase):
+    @override_settings(AWS_CRAWL_THREADS=4)
+    def test_crawl_every_region(self):
+        regions = ['region-%d' % i for i in range(6)]
+        results = list(crawl(lambda region, aws_account: region.upper(),
+                             regions, ['account']))
+        self.assertEqual(len(results), len(regions))
+        for region, aws_account, result in results:
+            self.assertEqual(aws_account, 'account')
+            self.assertEqual(result, region.upper())
+
+    @override_settings(AWS_CRAWL_THREADS=4)
+    def test_crawl_pages_of_every_region(self):
+        regions = ['region-%d' % i for i in range(6)]
+        pages = {}
+        for region, aws_account, page in crawl_pages(
+                lambda region, aws_account: ([region, i] for i in range(3)),
+                regions, ['account']):
+            # The end of the pages of a region comes after all of them
+            self.assertNotIn(None, pages.get(region, []))
+            pages.setdefault(region, []).append(page)
+        self.assertEqual(pages, {region: [[region, 0], [region, 1],
+                                          [region, 2], None]
+                                 for region in regions})
+
+    @override_settings(AWS_CRAWL_THREADS=4)
+    def test_crawl_pages_without_unavailable_region(self):
+        regions = [Region(region_name='region-%d' % i) for i in range(4)]
+
+        def describe_pages(region, aws_account):
+            yield [region.pk]
+            if region.pk == 'region-2':
+                raise RegionUnavailableException('unavailable')
+            yield [region.pk]
+
+        pages = {}
+        with self.assertRaises(RegionUnavailableException):
+            for region, aws_account, page in crawl_pages(
+                    describe_pages, regions, [AwsAccount(pk=1)]):
+                pages.setdefault(region.pk, []).append(page)
+        # The pages of the unavailable region aren't followed by None
+        self.assertEqual(pages.pop('region-2'), [['region-2']])
+        self.assertEqual(pages, {region.pk: [[region.pk], [region.pk], None]
+                                 for region in regions
+                                 if region.pk != 'region-2'})
+
+
+class IntrospectionTests(TestCase):
+    def test_introspect(self):
+        volume = Volume()
+        volume.id = 'vol-1'
+        volume.size = 8
+        volume.type = 'gp2'
+        attrs = introspect(volume, Ec2Volume)
+        self.assertEqual(attrs['id'], 'vol-1')
+        self.assertEqual(attrs['size'], 8)
+        self.assertEqual(attrs['type'], 'gp2')
+        # Relations are left to the caller
+        self.assertNotIn('tags', attrs)
+        self.assertNotIn('availability_zone', attrs)
+        self.assertEqual(introspect(None, Ec2Volume), {})
+
+
+class ConnectionRegistryTests(TestCase):
+    def test_connections_reused_until_credentials_change(self):
+        registry = ConnectionRegistry()
+        aws_account = AwsAccount(pk=1, name='account',
+                                 aws_access_key_id='key',
+                                 aws_secret_access_key='secret')
+        connection = registry.get(aws_account, 'eu-west-1')
+        self.assertIs(registry.get(aws_account, 'eu-west-1'), connection)
+        self.assertIsNot(registry.get(aws_account, 'eu-west-1', 'elb'),
+                         connection)
+
+        aws_account.aws_secret_access_key = 'new-secret'
+        self.assertIsNot(registry.get(aws_account, 'eu-west-1'), connection)
+
+        connection = registry.get(aws_account, 'eu-west-1')
+        registry.invalidate(aws_account.pk)
+        self.assertIsNot(registry.get(aws_account, 'eu-west-1'), connection)
+
+    @override_settings(AWS_TIMEOUT={'socket': 3, 'call': 30})
+    def test_connections_time_out(self):
+        aws_account = AwsAccount(pk=1, name='account',
+                                 aws_access_key_id='key',
+                                 aws_secret_access_key='secret')
+        connection = ConnectionRegistry().get(aws_account, 'eu-west-1')
+        http_connection = connection.new_http_connection(
+            connection.host, connection.port, connection.is_secure)
+        self.assertEqual(http_connection.timeout, 3)
+
+
+class _RecordingQueue(object):
+    """Records the jobs enqueued instead of running them."""
+
+    def __init__(self):
+        self.jobs = []
+
+    def enqueue(self, func, *args, **kwargs):
+        self.jobs.append((func, args))
+
+
+class RefreshTests(TestCase):
+    def test_sort_resource_ids(self):
+        controller = AwsResourcesController(None)
+        self.assertEqual(
+            controller._sort_resource_ids(None, ['i-1', 'vol-2', 'i-3']),
+            {'instances': ['i-1', 'i-3'], 'volumes': ['vol-2']})
+        self.assertEqual(controller._sort_resource_ids(['keypairs'], ['a']),
+                         {'keypairs': ['a']})
+        with self.assertRaises(ValueError):
+            controller._sort_resource_ids(None, ['my-keypair'])
+        with self.assertRaises(ValueError):
+            controller._sort_resource_ids(['amis', 'volumes'], ['i-1'])
+
+    @override_settings(REGION_SKIPPING={'empty_refreshes': 2,
+                                        'probe_interval': 60 * 60})
+    def test_select_regions(self):
+        aws_account = AwsAccount.objects.create(
+            name='account', aws_access_key_id='key',
+            aws_secret_access_key='secret')
+        regions = [Region.objects.create(region_name=name) for name in
+                   ('eu-west-1', 'us-east-1', 'us-west-1', 'sa-east-1')]
+        now = timezone.now()
+        for region, empty_refreshes, last_probed in (
+                (regions[0], 0, now),
+                (regions[1], 2, now),
+                (regions[2], 2, now - datetime.timedelta(hours=2))):
+            RegionActivity.objects.create(aws_account=aws_account,
+                                          region=region,
+                                          empty_refreshes=empty_refreshes,
+                                          last_probed=last_probed)
+        # The regions left empty are only probed once in a while
+        self.assertEqual(select_regions(aws_account, regions),
+                         ([regions[0], regions[3]], [regions[2]]))
+
+    @override_settings(RESOURCE_REFRESH_CADENCES={'instances': 5,
+                                                  'amis': 6 * 60})
+    def test_claim_stale_resource_types(self):
+        # The AwsUser is created with its User
+        aws_user = AwsUser.objects.get(
+            user=User.objects.create_user(username='user'))
+        resource_types = ['amis', 'instances', 'volumes']
+        self.assertEqual(list(claim_stale_resource_types(aws_user,
+                                                         resource_types)),
+                         resource_types)
+        self.assertEqual(claim_stale_resource_types(aws_user, resource_types),
+                         {})
+        last_refreshed = timezone.now() - datetime.timedelta(minutes=30)
+        ResourceFreshness.objects.filter(aws_user=aws_user).update(
+            last_refreshed=last_refreshed)
+        # Volumes fall back to the interval of the user, 60 minutes
+        self.assertEqual(claim_stale_resource_types(aws_user, resource_types),
+                         {'instances': last_refreshed})
+
+    def test_concurrent_claims(self):
+        aws_user = AwsUser.objects.get(
+            user=User.objects.create_user(username='user'))
+        ResourceFreshness.objects.create(
+            aws_user=aws_user, resource_type='amis',
+            last_refreshed=timezone.now() - datetime.timedelta(days=1))
+        resource_types = ['amis', 'instances']
+        # Both requests read the types due before either claims them
+        stale = resource_freshness._get_stale_resource_types(aws_user,
+                                                             resource_types)
+        with mock.patch.object(resource_freshness,
+                               '_get_stale_resource_types',
+                               return_value=stale):
+            claims = claim_stale_resource_types(aws_user, resource_types)
+            self.assertEqual(list(claims), resource_types)
+            self.assertEqual(
+                claim_stale_resource_types(aws_user, resource_types), {})
+
+        release_resource_types(aws_user, claims)
+        self.assertEqual(claim_stale_resource_types(aws_user, resource_types),
+                         claims)
+
+    def test_claims_released(self):
+        user = User.objects.create_user(username='user')
+        aws_user = AwsUser.objects.get(user=user)
+        aws_user.aws_accounts.add(AwsAccount.objects.create(
+            name='account', aws_access_key_id='key',
+            aws_secret_access_key='secret'))
+        Region.objects.create(region_name='eu-west-1')
+        controller = AwsResourcesController(user)
+        start_refresh = 'dashboard.vendor.aws_resources_controller.' \
+                        'start_refresh'
+
+        with mock.patch(start_refresh, side_effect=RuntimeError('failure')), \
+                self.assertRaises(RuntimeError):
+            controller.refresh_stale_resources()
+        self.assertFalse(ResourceFreshness.objects.exists())
+        self.assertEqual(AwsUser.objects.get(pk=aws_user.pk)
+                         .prices_last_updated, aws_user.prices_last_updated)
+
+        # The resources are already refreshed by another refresh
+        with mock.patch(start_refresh, return_value=Refresh(id='other')):
+            self.assertEqual(controller.refresh_stale_resources().pk,
+                             'other')
+        self.assertFalse(ResourceFreshness.objects.exists())
+
+        with mock.patch(start_refresh, side_effect=lambda refresh_id, *args,
+                        **kwargs: Refresh(id=refresh_id)):
+            controller.refresh_stale_resources()
+        self.assertEqual(ResourceFreshness.objects.count(),
+                         len(RECEPTION_JOBS))
+        self.assertTrue(AwsUser.objects.get(pk=aws_user.pk)
+                        .prices_up_to_date())
+
+    def test_overlapping_refreshes(self):
+        aws_user = AwsUser.objects.get(
+            user=User.objects.create_user(username='user'))
+        aws_account = AwsAccount.objects.create(
+            name='account', aws_access_key_id='key',
+            aws_secret_access_key='secret')
+        regions = [Region.objects.create(region_name='eu-west-1')]
+        queue = _RecordingQueue()
+        with mock.patch('django_rq.get_queue', return_value=queue):
+            refresh = start_refresh(uuid.uuid4().hex, aws_user,
+                                    [aws_account], regions,
+                                    resource_types=list(RECEPTION_JOBS))
+            jobs = len(queue.jobs)
+            # The resources being refreshed are left to the first refresh
+            refresh_id = uuid.uuid4().hex
+            self.assertEqual(start_refresh(refresh_id, aws_user,
+                                           [aws_account], regions,
+                                           resource_types=['instances']),
+                             refresh)
+        self.assertFalse(Refresh.objects.filter(pk=refresh_id).exists())
+        self.assertEqual(len(queue.jobs), jobs)
+
+
+@override_settings(AWS_BACKEND='fake', AWS_CRAWL_THREADS=1,
+                   AWS_DESCRIBE_PAGE_SIZE=25,
+                   FAKE_AWS={'resources_per_account': 200,
+                             'regions': ('eu-west-1',)})
+class FakeAwsTests(TestCase):
+    def setUp(self):
+        fake_aws.reset()
+        region = Region.objects.create(region_name='eu-west-1')
+        for suffix in 'abc':
+            AvailabilityZone.objects.create(name='eu-west-1' + suffix,
+                                            region=region)
+        self.aws_account = AwsAccount.objects.create(
+            name='account', aws_access_key_id='key',
+            aws_secret_access_key='secret')
+
+    def tearDown(self):
+        connection_registry.invalidate(self.aws_account.pk)
+
+    def test_reception_jobs(self):
+        for receive in RECEPTION_JOBS.values():
+            receive(['eu-west-1'], [self.aws_account.pk])
+        dataset = fake_aws.get_dataset('key', 'eu-west-1')
+        self.assertEqual(Ec2Instance.objects.count(), len(dataset.instances))
+        self.assertEqual(Ec2Volume.objects.count(), len(dataset.volumes))
+        self.assertEqual(Ec2Snapshot.objects.count(),
+                         len(dataset.snapshots))
+        self.assertEqual(Ec2LoadBalancer.objects.count(),
+                         len(dataset.load_balancers))
+        self.assertEqual(
+            Ec2Instance.objects.filter(security_groups__isnull=False)
+            .distinct().count(), len(dataset.instances))
+
+        fake_aws.advance(0.5)
+        RECEPTION_JOBS['instances'](['eu-west-1'], [self.aws_account.pk])
+        for instance in dataset.instances.values():
+            self.assertEqual(Ec2Instance.objects.get(pk=instance['id']).state,
+                             instance['state'])
+
+    def test_security_group_detached(self):
+        for receive in RECEPTION_JOBS.values():
+            receive(['eu-west-1'], [self.aws_account.pk])
+        instance = next(
+            instance for instance in fake_aws.get_dataset(
+                'key', 'eu-west-1').instances.values()
+            if len(instance['groups']) > 1)
+        # The security groups are the only change of the instance
+        instance['groups'] = instance['groups'][:1]
+        RECEPTION_JOBS['instances'](['eu-west-1'], [self.aws_account.pk])
+        self.assertEqual(
+            list(Ec2Instance.objects.get(pk=instance['id'])
+                 .security_groups.values_list('id', flat=True)),
+            instance['groups'])
+
+    def test_instance_states(self):
+        for receive in RECEPTION_JOBS.values():
+            receive(['eu-west-1'], [self.aws_account.pk])
+        dataset = fake_aws.get_dataset('key', 'eu-west-1')
+        fake_aws.advance(0.5)
+        changed = [instance['id'] for instance in dataset.instances.values()
+                   if Ec2Instance.objects.get(pk=instance['id']).state !=
+                   instance['state']]
+        self.assertEqual(receive_instance_states_async(
+            ['eu-west-1'], [self.aws_account.pk]), len(changed))
+        for instance in dataset.instances.values():
+            ec2_instance = Ec2Instance.objects.get(pk=instance['id'])
+            self.assertEqual(ec2_instance.state, instance['state'])
+            self.assertEqual(bool(ec2_instance.public_dns_name),
+                             instance['state'] == 'running')
+        # The next refresh of the instances writes them again
+        self.assertEqual(Ec2Instance.objects.filter(
+            content_hash__isnull=True).count(), len(changed))
+
+    def test_interrupted_crawl_deletes_nothing(self):
+        for receive in RECEPTION_JOBS.values():
+            receive(['eu-west-1'], [self.aws_account.pk])
+        dataset = fake_aws.get_dataset('key', 'eu-west-1')
+        terminated = list(dataset.instances)[-5:]
+        for instance_id in terminated:
+            del dataset.instances[instance_id]
+        # Persisted before its zone was known
+        Ec2Instance.objects.filter(pk=terminated[0]).update(
+            availability_zone=None)
+        count = Ec2Instance.objects.count()
+        describe_pages = aws_resources_reception._describe_pages
+
+        for error in (RuntimeError('failure'),
+                      RegionUnavailableException('unavailable')):
+            def interrupted(*args):
+                pages = iter(describe_pages(*args))
+                yield next(pages)
+                raise error
+
+            with mock.patch.object(aws_resources_reception,
+                                   '_describe_pages', interrupted), \
+                    self.assertRaises(type(error)):
+                RECEPTION_JOBS['instances'](['eu-west-1'],
+                                            [self.aws_account.pk])
+            self.assertEqual(Ec2Instance.objects.count(), count)
+
+        RECEPTION_JOBS['instances'](['eu-west-1'], [self.aws_account.pk])
+        self.assertEqual(Ec2Instance.objects.count(), len(dataset.instances))
+
+    def _receive_instances_interrupted(self, refresh_id):
+        # Fails on the second page, after persisting its instances
+        sync_tags = aws_resources_reception._sync_resources_tags
+        calls = []
+
+        def interrupted(*args):
+            calls.append(args)
+            if len(calls) == 2:
+                raise RuntimeError('interrupted')
+            return sync_tags(*args)
+
+        with mock.patch.object(aws_resources_reception,
+                               '_sync_resources_tags', interrupted), \
+                self.assertRaises(RuntimeError):
+            RECEPTION_JOBS['instances'](['eu-west-1'], [self.aws_account.pk],
+                                        refresh_id=refresh_id)
+
+    def _create_refresh(self):
+        aws_user = AwsUser.objects.get(
+            user=User.objects.create_user(username='user'))
+        return Refresh.objects.create(id=uuid.uuid4().hex, aws_user=aws_user)
+
+    def test_instances_from_checkpoint(self):
+        refresh = self._create_refresh()
+        self._receive_instances_interrupted(refresh.pk)
+        checkpoint = RefreshCheckpoint.objects.get(refresh=refresh,
+                                                   resource_type='instances')
+        self.assertEqual(checkpoint.pages_done, 1)
+        self.assertIsNotNone(checkpoint.page_token)
+        self.assertFalse(checkpoint.finished)
+
+        dataset = fake_aws.get_dataset('key', 'eu-west-1')
+        requests = fake_aws.get_request_counts()['DescribeInstances']
+        RECEPTION_JOBS['instances'](['eu-west-1'], [self.aws_account.pk],
+                                    refresh_id=refresh.pk)
+        # Only the pages after the checkpoint are described
+        pages = -(-len(dataset.instances) // 25)
+        self.assertEqual(fake_aws.get_request_counts()['DescribeInstances'],
+                         requests + pages - 1)
+        self.assertEqual(Ec2Instance.objects.count(), len(dataset.instances))
+        checkpoint.refresh_from_db()
+        self.assertTrue(checkpoint.finished)
+
+        # The (account, region) finished isn't described again
+        requests = fake_aws.get_request_counts()['DescribeInstances']
+        RECEPTION_JOBS['instances'](['eu-west-1'], [self.aws_account.pk],
+                                    refresh_id=refresh.pk)
+        self.assertEqual(fake_aws.get_request_counts()['DescribeInstances'],
+                         requests)
+
+    def test_seen_ids_expired(self):
+        refresh = self._create_refresh()
+        self._receive_instances_interrupted(refresh.pk)
+        region = Region.objects.get(pk='eu-west-1')
+        django_rq.get_connection('high').delete(
+            Checkpoints(refresh.pk, 'instances', [self.aws_account],
+                        [region])._ids_key(self.aws_account.pk, region.pk))
+        # Terminated after the second page was persisted
+        dataset = fake_aws.get_dataset('key', 'eu-west-1')
+        terminated = list(dataset.instances)[30]
+        del dataset.instances[terminated]
+
+        RECEPTION_JOBS['instances'](['eu-west-1'], [self.aws_account.pk],
+                                    refresh_id=refresh.pk)
+        # The instances of the first page weren't seen by this attempt
+        self.assertEqual(Ec2Instance.objects.count(),
+                         len(dataset.instances) + 1)
+        self.assertTrue(Ec2Instance.objects.filter(pk=terminated).exists())
+        self.assertTrue(RefreshCheckpoint.objects.get(
+            refresh=refresh, resource_type='instances').finished)
+
+    def test_pages_from_checkpoint(self):
+        inventory = Inventory(
+            connection_registry.get(self.aws_account, 'eu-west-1'),
+            self.aws_account, 'eu-west-1')
+        pages = list(inventory.pages('volumes'))
+        self.assertGreater(len(pages), 2)
+        self.assertIsNone(pages[-1].next_token)
+        resumed = list(inventory.pages('volumes', (1, pages[0].next_token)))
+        self.assertEqual([page.number for page in resumed],
+                         [page.number for page in pages[1:]])
+        self.assertEqual([v.id for page in resumed for v in page],
+                         [v.id for page in pages[1:] for v in page])
+        self.assertEqual(
+            list(inventory.pages('volumes', (len(pages), None))), [])
+
+    def _start_refresh(self, aws_accounts, resource_types):
+        aws_user = AwsUser.objects.get(
+            user=User.objects.create_user(username='user'))
+        return start_refresh(uuid.uuid4().hex, aws_user, aws_accounts,
+                             list(Region.objects.all()),
+                             resource_types=resource_types)
+
+    def test_refresh_units(self):
+        aws_accounts = [self.aws_account, AwsAccount.objects.create(
+            name='other', aws_access_key_id='other',
+            aws_secret_access_key='secret')]
+        # The prices would be scraped from the AWS website
+        resource_types = [resource_type for resource_type in
+                          STAGE_DEPENDENCIES if resource_type != 'prices']
+        with mock.patch.dict(QUEUES['high'], {'ASYNC': False}), \
+                mock.patch('dashboard.vendor.aws_resources_refresh.'
+                           'add_instance_prices'):
+            refresh = self._start_refresh(aws_accounts, resource_types)
+        connection_registry.invalidate(aws_accounts[1].pk)
+        refresh.refresh_from_db()
+        # A unit by resource type and account in the region, and the global
+        # instance prices
+        self.assertEqual(refresh.units_total, 2 * len(RECEPTION_JOBS) + 1)
+        self.assertEqual(refresh.units_done, refresh.units_total)
+        self.assertIsNotNone(refresh.finished_time)
+        self.assertEqual(Ec2Instance.objects.count(), sum(
+            len(fake_aws.get_dataset(key, 'eu-west-1').instances)
+            for key in ('key', 'other')))
+
+    def test_refresh_stages_enqueued_once(self):
+        queue = _RecordingQueue()
+        with mock.patch('django_rq.get_queue', return_value=queue):
+            refresh = self._start_refresh([self.aws_account],
+                                          list(RECEPTION_JOBS))
+            units = RefreshUnit.objects.filter(refresh=refresh)
+            # Only the stages without dependencies start
+            self.assertEqual(
+                set(units.get(pk=args[0]).resource_type
+                    for _, args in queue.jobs),
+                set(stage for stage in RECEPTION_JOBS
+                    if not STAGE_DEPENDENCIES[stage]))
+            self.assertEqual(units.filter(status='waiting').count(),
+                             len(RECEPTION_JOBS) - len(queue.jobs))
+
+            units.filter(status='queued').update(status='done')
+            # The dependencies completing at the same time both try to
+            # enqueue their dependents
+            for resource_type in ('security_groups', 'amis', 'amis'):
+                _enqueue_dependent_units(units.get(
+                    resource_type=resource_type))
+            enqueued = [units.get(pk=args[0]).resource_type
+                        for _, args in queue.jobs[3:]]
+            self.assertEqual(sorted(enqueued), ['instances', 'snapshots'])
+
+    def test_global_stage_waits_for_all(self):
+        aws_accounts = [self.aws_account, AwsAccount.objects.create(
+            name='other', aws_access_key_id='other',
+            aws_secret_access_key='secret')]
+        statuses = []
+
+        def add_instance_prices():
+            statuses.extend(RefreshUnit.objects.filter(
+                resource_type='instances').values_list('status', flat=True))
+
+        with mock.patch.dict(QUEUES['high'], {'ASYNC': False}), \
+                mock.patch('dashboard.vendor.aws_resources_refresh.'
+                           'add_instance_prices', add_instance_prices):
+            refresh = self._start_refresh(
+                aws_accounts, list(RECEPTION_JOBS) + ['instance_prices'])
+        connection_registry.invalidate(aws_accounts[1].pk)
+        self.assertEqual(statuses, ['done', 'done'])
+        self.assertEqual(RefreshUnit.objects.get(
+            refresh=refresh, resource_type='instance_prices').status, 'done')
+
+    @override_settings(REFRESH_UNIT_ATTEMPTS=2)
+    def test_refresh_finished_despite_dependencies(self):
+        def fail(*args, **kwargs):
+            raise RuntimeError('failure')
+
+        def unavailable(*args, **kwargs):
+            raise RegionUnavailableException('unavailable')
+
+        with mock.patch.dict(QUEUES['high'], {'ASYNC': False}), \
+                mock.patch.dict(RECEPTION_JOBS, {
+                    'amis': fail, 'security_groups': unavailable}):
+            refresh = self._start_refresh([self.aws_account],
+                                          list(RECEPTION_JOBS))
+        refresh.refresh_from_db()
+        units = RefreshUnit.objects.filter(refresh=refresh)
+        # The failing unit was attempted again before giving up
+        self.assertEqual(units.get(resource_type='amis').attempts, 2)
+        self.assertEqual(units.get(resource_type='amis').status, 'failed')
+        self.assertEqual(units.get(resource_type='security_groups').status,
+                         'stale')
+        # The units waiting for them still ran
+        self.assertEqual(refresh.units_failed, 1)
+        self.assertEqual(refresh.units_stale, 1)
+        self.assertEqual(refresh.units_done, len(RECEPTION_JOBS) - 2)
+        self.assertIsNotNone(refresh.finished_time)
+
+
+class RateLimitingTests(TestCase):
+    @override_settings(FAKE_AWS={'resources_per_account': 100,
+                                 'regions': ('eu-west-1',),
+                                 'throttle_rate': 0.3})
+    def test_throttled_requests_retried(self):
+        fake_aws.reset()
+        bucket = AdaptiveTokenBucket(rate=1000.0, burst=1000)
+        connection = limit_rate(fake_aws.connect_ec2('eu-west-1', 'key'),
+                                bucket, retries=20, backoff=0)
+        keypairs = fake_aws.get_dataset('key', 'eu-west-1').keypairs
+        for i in range(20):
+            self.assertEqual(len(connection.get_all_key_pairs()),
+                             len(keypairs))
+        self.assertGreater(
+            fake_aws.get_request_counts()['DescribeKeyPairs'], 20)
+        self.assertLess(bucket.rate, 1000.0)
+
+    def test_rate_adapted(self):
+        bucket = AdaptiveTokenBucket(rate=10.0, min_rate=1.0, max_rate=12.0,
+                                     increase=5.0, decrease=0.5)
+        bucket.on_throttling()
+        self.assertEqual(bucket.rate, 5.0)
+        bucket.on_success()
+        self.assertEqual(bucket.rate, 6.0)
+        for i in range(10):
+            bucket.on_throttling()
+        self.assertEqual(bucket.rate, 1.0)
+        for i in range(100):
+            bucket.on_success()
+        self.assertEqual(bucket.rate, 12.0)
+
+
+class CircuitBreakerTests(TestCase):
+    def setUp(self):
+        # The breakers of other runs are kept in Redis for their cooldown
+        self.aws_account_id = uuid.uuid4().hex
+
+    def _breaker(self, **kwargs):
+        return CircuitBreaker(self.aws_account_id, 'eu-west-1', **kwargs)
+
+    def test_opened_after_failures(self):
+        breaker = self._breaker(failures=3, cooldown=60)
+        for i in range(2):
+            breaker.record_failure()
+            self.assertFalse(breaker.is_open())
+        breaker.record_failure()
+        self.assertTrue(breaker.is_open())
+        # The breaker is shared by the workers
+        self.assertTrue(self._breaker().is_open())
+
+    def test_failures_reset_by_success(self):
+        breaker = self._breaker(failures=2, cooldown=60)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertFalse(breaker.is_open())
+
+    def test_closed_after_cooldown(self):
+        breaker = self._breaker(failures=1, cooldown=1)
+        breaker.record_failure()
+        self.assertTrue(breaker.is_open())
+        time.sleep(1.1)
+        self.assertFalse(breaker.is_open())
+
+    def test_closed_breaker_checked_every_interval(self):
+        breaker = self._breaker(check_interval=0.5)
+        self.assertFalse(breaker.is_open())
+        # Opened by another worker, seen at the next check
+        self._breaker(failures=1, cooldown=60).record_failure()
+        self.assertFalse(breaker.is_open())
+        time.sleep(0.6)
+        self.assertTrue(breaker.is_open())
+
+    @override_settings(FAKE_AWS={'resources_per_account': 100,
+                                 'regions': ('eu-west-1',),
+                                 'throttle_rate': 1.0})
+    def test_region_unavailable_once_opened(self):
+        fake_aws.reset()
+        connection = limit_rate(fake_aws.connect_ec2('eu-west-1', 'key'),
+                                AdaptiveTokenBucket(rate=1000.0, burst=1000),
+                                retries=0, backoff=0,
+                                breaker=self._breaker(failures=2,
+                                                      cooldown=60))
+        # A failure not opening the breaker fails like without it
+        with self.assertRaises(EC2ResponseError):
+            connection.get_all_key_pairs()
+        with self.assertRaises(RegionUnavailableException):
+            connection.get_all_key_pairs()
+        requests = fake_aws.get_request_counts()['DescribeKeyPairs']
+        with self.assertRaises(RegionUnavailableException):
+            connection.get_all_key_pairs()
+        self.assertEqual(fake_aws.get_request_counts()['DescribeKeyPairs'],
+                         requests)
@@ -27,7 +27,10 @@ from django.views.generic import TemplateView
 from django_tables2 import SingleTableView
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
+from django.http import HttpResponseBadRequest
 from django.http import HttpResponseRedirect
+from django.http import JsonResponse
+from django.views.decorators.http import require_POST
 
 from dashboard.models.ec2.ec2_ami import Ec2Ami
 from dashboard.models.ec2.ec2_elastic_ip import Ec2ElasticIp
@@ -48,6 +51,7 @@ from dashboard.tables import Ec2SnapshotTable
 from dashboard.tables import Ec2TagTable
 from dashboard.tables import Ec2VolumeTable
 from dashboard.vendor.aws_resources_controller import AwsResourcesController
+from dashboard.vendor.exceptions import NoAwsAccountException
 from aws_account.models import AwsUser
 
 __author__ = 'Arnaud Desclouds <arnaud.software@use.startmail.com>'
@@ -91,6 +95,61 @@ def change_state_ec2_instances_view(request):
         return HttpResponseRedirect('/ec2instances/')
 
 
+@login_required
+@require_POST
+def refresh_resources_view(request):
+    """Starts a refresh of the resources selected by the form.
+
+    The resource_type, aws_account and region fields may be repeated, each of
+    them left out selects everything. The resource_ids field holds ids
+    separated by spaces or commas. With the full_sweep field, a refresh of
+    everything also crawls the regions where an account has had no resources
+    for a while. A client accepting JSON gets the id of the refresh, the
+    others are redirected to the page they came from.
+    """
+    resource_ids = request.POST.get('resource_ids', '').replace(',', ' ')
+    try:
+        refresh = AwsResourcesController(request.user).refresh(
+            resource_types=request.POST.getlist('resource_type') or None,
+            aws_account_ids=[int(pk) for pk
+                             in request.POST.getlist('aws_account')] or None,
+            region_names=request.POST.getlist('region') or None,
+            resource_ids=resource_ids.split() or None,
+            full_sweep=bool(request.POST.get('full_sweep')))
+    except (ValueError, NoAwsAccountException) as e:
+        return HttpResponseBadRequest(str(e))
+
+    if 'application/json' in request.META.get('HTTP_ACCEPT', ''):
+        return JsonResponse({'refresh_id': refresh.pk,
+                             'units_total': refresh.units_total})
+    return HttpResponseRedirect(request.META.get('HTTP_REFERER',
+                                                 '/aws-accounts/'))
+
+
+@login_required
+@require_POST
+def refresh_instance_states_view(request):
+    """Starts a refresh of the states of the instances.
+
+    Like refresh_resources_view, the aws_account and region fields may be
+    repeated, each of them left out selects everything. A client accepting
+    JSON gets the id of the job, the others are redirected to the page they
+    came from.
+    """
+    try:
+        job = AwsResourcesController(request.user).refresh_instance_states(
+            aws_account_ids=[int(pk) for pk
+                             in request.POST.getlist('aws_account')] or None,
+            region_names=request.POST.getlist('region') or None)
+    except (ValueError, NoAwsAccountException) as e:
+        return HttpResponseBadRequest(str(e))
+
+    if 'application/json' in request.META.get('HTTP_ACCEPT', ''):
+        return JsonResponse({'job_id': job.id})
+    return HttpResponseRedirect(request.META.get('HTTP_REFERER',
+                                                 '/ec2instances/'))
+
+
 def change_state_ec2_volumes_view(request):
     if request.method == 'POST':
         pks = request.POST.getlist('selected_ec2volume')